@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import random
+import string
+import tempfile
+from watchlist import write_index, WatchlistIndex, Watchlist
+
+# Usage: python bench_watchlist.py [entries]   (default 10M)
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+LOOKUPS = 100_000
+
+
+def random_plate(rng):
+    return (
+        "".join(rng.choices(string.ascii_uppercase, k=2))
+        + str(rng.randint(1, 99))
+        + "".join(rng.choices(string.ascii_uppercase, k=rng.randint(1, 2)))
+        + f"{rng.randint(0, 9999):04d}"
+    )
+
+
+def timed(label, fn, n=1):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    if n > 1:
+        print(f"{label}: {elapsed / n * 1e6:.2f} µs/lookup")
+    else:
+        print(f"{label}: {elapsed:.2f} s")
+    return result
+
+
+rng = random.Random(42)
+plates = timed("Generate plates", lambda: [random_plate(rng) for _ in range(COUNT)])
+entries = ((p, i & 1) for i, p in enumerate(plates))
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "bench.idx")
+    count = timed("Build index", lambda: write_index(path, entries, ["Stolen", "Blacklisted"]))
+    print(f"Index: {count} unique plates, {os.path.getsize(path) / 1e6:.1f} MB")
+
+    watchlist = Watchlist(os.path.join(tmp, "missing.csv"))
+    watchlist.index = timed("Load index (mmap)", lambda: WatchlistIndex(path))
+
+    hits = rng.sample(plates, LOOKUPS)
+    misses = [random_plate(rng) for _ in range(LOOKUPS)]
+    del plates
+
+    timed("Exact lookup, hit", lambda: [watchlist.match(p, fuzzy=False) for p in hits], LOOKUPS)
+    timed("Exact lookup, miss", lambda: [watchlist.match(p, fuzzy=False) for p in misses], LOOKUPS)
+    timed("Fuzzy lookup, hit", lambda: [watchlist.match(p) for p in hits], LOOKUPS)
+    timed("Fuzzy lookup, miss", lambda: [watchlist.match(p) for p in misses], LOOKUPS)
+
+    false_hits = sum(1 for p in misses if watchlist.match(p, fuzzy=False))
+    print(f"Random misses matched: {false_hits} (real collisions with the list)")
+    watchlist.index = None
@@ -0,0 +1,188 @@
+import os
+import glob
+import time
+import threading
+import cv2
+
+# Frame sources for the lane. Every source has the same interface:
+#   read()    -> (frame, captured_at) or (None, None); captured_at is time.monotonic()
+#   connected -> False while a camera is being reconnected
+#   release()
+RECONNECT_MIN_DELAY = 0.5
+RECONNECT_MAX_DELAY = 10.0
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def frame_age(captured_at):
+    return time.monotonic() - captured_at
+
+
+class CameraSource:
+    """Live camera (index, device path or stream URL) that always serves the newest frame.
+
+    A background thread owns the capture and drains it as fast as frames
+    arrive, so the driver buffer never fills with stale frames. Each frame
+    replaces the previous one in a slot, and read() just takes whatever is
+    there: at most about one frame period old, and the caller never waits on
+    the camera, not even while it is reconnecting.
+    """
+
+    def __init__(self, source=0, width=None, height=None, fps=None, mjpeg=False, buffer_size=1):
+        self.source = source
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.mjpeg = mjpeg
+        self.buffer_size = buffer_size
+        self.connected = False
+        self._slot = (None, None)
+        self._running = True
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._grab_loop, daemon=True)
+        self._thread.start()
+
+    def _open(self):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        # FOURCC has to be set before the resolution for most UVC drivers
+        if self.mjpeg:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        if self.width:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps:
+            cap.set(cv2.CAP_PROP_FPS, self.fps)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        return cap
+
+    def _grab_loop(self):
+        cap = None
+        delay = RECONNECT_MIN_DELAY
+        while self._running:
+            if cap is None:
+                cap = self._open()
+                if cap is None:
+                    print(f"⚠️ Camera {self.source} unavailable, retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                    continue
+
+            # Blocks for up to a frame period (or a driver timeout); no lock held
+            if not cap.grab():
+                # Opens but delivers nothing (e.g. held by another process): back off too
+                cap.release()
+                cap = None
+                self.connected = False
+                print(f"⚠️ Camera {self.source} not delivering frames, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                continue
+            grabbed_at = time.monotonic()
+            if not self.connected:
+                self.connected = True
+                delay = RECONNECT_MIN_DELAY
+                print(f"✅ Camera {self.source} connected.")
+
+            ok, frame = cap.retrieve()
+            if ok:
+                with self._lock:
+                    self._slot = (frame, grabbed_at)
+
+        if cap is not None:
+            cap.release()
+        self.connected = False
+
+    def read(self):
+        with self._lock:
+            frame, captured_at = self._slot
+            self._slot = (None, None)  # each frame is handed out once
+        return frame, captured_at
+
+    def release(self):
+        # The grab thread releases the capture itself once grab() returns
+        self._running = False
+        self._thread.join(timeout=2)
+
+
+class VideoFileSource:
+    """Recorded video played back in real time, skipping frames to stay current like a camera."""
+
+    def __init__(self, path, loop=True):
+        self.path = path
+        self.loop = loop
+        self._cap = cv2.VideoCapture(path)
+        self.connected = self._cap.isOpened()
+        self._fps = self._cap.get(cv2.CAP_PROP_FPS) or 25
+        self._start = time.monotonic()
+        self._pos = 0
+
+    def read(self):
+        if not self.connected:
+            return None, None
+        target = int((time.monotonic() - self._start) * self._fps)
+        # Skipped frames are grabbed but never decoded
+        while self._pos < target and self._cap.grab():
+            self._pos += 1
+        ok, frame = self._cap.read()
+        if not ok:
+            if not self.loop:
+                return None, None
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self._start = time.monotonic()
+            self._pos = 0
+            ok, frame = self._cap.read()
+            if not ok:
+                return None, None
+        self._pos += 1
+        return frame, time.monotonic()
+
+    def release(self):
+        self._cap.release()
+        self.connected = False
+
+
+class ImageSequenceSource:
+    """Still images from a folder or glob pattern, one per read(), in name order."""
+
+    def __init__(self, pattern, loop=True):
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*")
+        self.paths = sorted(p for p in glob.glob(pattern) if p.lower().endswith(IMAGE_EXTENSIONS))
+        self.loop = loop
+        self.connected = bool(self.paths)
+        self._index = 0
+
+    def read(self):
+        if self._index >= len(self.paths):
+            if not self.loop or not self.paths:
+                return None, None
+            self._index = 0
+        frame = cv2.imread(self.paths[self._index])
+        self._index += 1
+        if frame is None:
+            return None, None
+        return frame, time.monotonic()
+
+    def release(self):
+        self.connected = False
+
+
+def open_capture(source=0, **options):
+    """Pick a source from what `source` looks like.
+
+    Camera indices, device paths and stream URLs go to CameraSource (options are
+    width, height, fps, mjpeg, buffer_size); folders and glob patterns to
+    ImageSequenceSource; any other existing file to VideoFileSource.
+    """
+    if isinstance(source, int) or str(source).isdigit():
+        return CameraSource(int(source), **options)
+    if "://" in source:
+        return CameraSource(source, **options)  # query strings may contain "?"
+    if os.path.isdir(source) or any(c in source for c in "*?[") or source.lower().endswith(IMAGE_EXTENSIONS):
+        return ImageSequenceSource(source)
+    if os.path.isfile(source):
+        return VideoFileSource(source)
+    return CameraSource(source, **options)
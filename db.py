@@ -1,8 +1,10 @@
 import sqlite3
 import hashlib
 
+DB_PATH = "logs.db"
+
 def init_db():
-    conn = sqlite3.connect("logs.db")
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
     # Create users table
@@ -28,6 +30,13 @@ def init_db():
         )
     ''')
 
+    # Journal transactions already written to vehicle_logs (see journal.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS journal_applied (
+            txn_id TEXT PRIMARY KEY
+        )
+    ''')
+
     conn.commit()
     conn.close()
 
@@ -35,7 +44,7 @@ def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
 def add_default_user():
-    conn = sqlite3.connect("logs.db")
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
     # Add default admin user if not exists
@@ -46,7 +55,7 @@ def add_default_user():
     conn.close()
 
 def authenticate_user(username, password):
-    conn = sqlite3.connect("logs.db")
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     hashed = hash_password(password)
     cursor.execute("SELECT * FROM users WHERE username=? AND password=?", (username, hashed))
@@ -55,7 +64,7 @@ def authenticate_user(username, password):
     return {"username": row[1], "lane_id": row[3]} if row else None
 
 def get_user_lane(username):
-    conn = sqlite3.connect("logs.db")
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT lane_id FROM users WHERE username=?", (username,))
     row = cursor.fetchone()
@@ -63,13 +72,41 @@ def get_user_lane(username):
     return row[0] if row else "Unknown"
 
 def log_entry(plate, vehicle_type, fastag_status, operator, lane_id):
-    conn = sqlite3.connect("logs.db")
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("INSERT INTO vehicle_logs (plate, vehicle_type, fastag_status, operator, lane_id) VALUES (?, ?, ?, ?, ?)",
                    (plate, vehicle_type, fastag_status, operator, lane_id))
     conn.commit()
     conn.close()
 
+def log_journal_entries(entries):
+    # One SQLite transaction per batch; txn ids already applied are skipped
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    for entry in entries:
+        cursor.execute("INSERT OR IGNORE INTO journal_applied (txn_id) VALUES (?)", (entry["txn"],))
+        if cursor.rowcount:
+            cursor.execute("INSERT INTO vehicle_logs (plate, vehicle_type, fastag_status, operator, lane_id, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                           (entry["plate"], entry["vehicle_type"], entry["fastag_status"],
+                            entry["operator"], entry["lane_id"], entry["timestamp"]))
+    conn.commit()
+    conn.close()
+
+def get_applied_txns():
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("SELECT txn_id FROM journal_applied")
+    rows = cursor.fetchall()
+    conn.close()
+    return {row[0] for row in rows}
+
+def clear_applied_txns():
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM journal_applied")
+    conn.commit()
+    conn.close()
+
 # Run this when script loads
 init_db()
 add_default_user()
@@ -1,4 +1,8 @@
 import random
+import sqlite3
+import threading
+
+FASTAG_DB_PATH = "fastag.db"
 
 FASTAG_DATABASE = {
     "MH14BK6899": {"status": "Valid", "tag_id": "FT12345", "balance": 60, "vehicle_class": "Car"},
@@ -6,6 +10,54 @@ FASTAG_DATABASE = {
     "MH12XY4321": {"status": "Invalid", "tag_id": None, "balance": 0.00, "vehicle_class": "Unknown"},
 }
 
+_lock = threading.Lock()
+
+def init_fastag_store():
+    # Balances live in fastag.db next to a ledger of the journal txn ids already
+    # applied to them, so a replayed txn never charges a tag twice
+    conn = sqlite3.connect(FASTAG_DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fastag_accounts (
+            plate TEXT PRIMARY KEY,
+            status TEXT,
+            tag_id TEXT,
+            balance REAL,
+            vehicle_class TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fastag_deductions (
+            txn_id TEXT PRIMARY KEY,
+            plate TEXT,
+            amount REAL
+        )
+    ''')
+    for plate, record in FASTAG_DATABASE.items():
+        cursor.execute("INSERT OR IGNORE INTO fastag_accounts VALUES (?, ?, ?, ?, ?)",
+                       (plate, record["status"], record["tag_id"], record["balance"], record["vehicle_class"]))
+    conn.commit()
+    conn.close()
+    load_fastag_accounts()
+
+def load_fastag_accounts():
+    conn = sqlite3.connect(FASTAG_DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("SELECT plate, status, tag_id, balance, vehicle_class FROM fastag_accounts")
+    rows = cursor.fetchall()
+    conn.close()
+    with _lock:
+        for plate, status, tag_id, balance, vehicle_class in rows:
+            FASTAG_DATABASE[plate] = {"status": status, "tag_id": tag_id, "balance": balance, "vehicle_class": vehicle_class}
+
+def save_fastag_record(plate_number, record):
+    conn = sqlite3.connect(FASTAG_DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("INSERT OR REPLACE INTO fastag_accounts VALUES (?, ?, ?, ?, ?)",
+                   (plate_number, record["status"], record["tag_id"], record["balance"], record["vehicle_class"]))
+    conn.commit()
+    conn.close()
+
 def check_fastag(plate_number):
     plate_number = plate_number.upper()
     record = FASTAG_DATABASE.get(plate_number)
@@ -37,12 +89,42 @@ def check_fastag(plate_number):
             }
 
         FASTAG_DATABASE[plate_number] = new_record
+        save_fastag_record(plate_number, new_record)
         return new_record
 
 def deduct_fastag_amount(plate_number, amount):
+    # In memory only; the journal replay persists it with apply_deductions()
     plate_number = plate_number.upper()
-    record = FASTAG_DATABASE.get(plate_number)
-    if record and record["status"] == "Valid" and record["balance"] >= amount:
-        record["balance"] -= amount
-        return True
+    with _lock:
+        record = FASTAG_DATABASE.get(plate_number)
+        if record and record["status"] == "Valid" and record["balance"] >= amount:
+            record["balance"] -= amount
+            return True
     return False
+
+def apply_deductions(entries):
+    # One SQLite transaction per journal batch; txn ids already in the ledger are skipped
+    conn = sqlite3.connect(FASTAG_DB_PATH)
+    cursor = conn.cursor()
+    for entry in entries:
+        if not (entry["deduct"] and entry.get("ok")):
+            continue
+        plate_number = entry["plate"].upper()
+        cursor.execute("INSERT OR IGNORE INTO fastag_deductions (txn_id, plate, amount) VALUES (?, ?, ?)",
+                       (entry["txn"], plate_number, entry["amount"]))
+        if cursor.rowcount:
+            cursor.execute("UPDATE fastag_accounts SET balance = balance - ? WHERE plate=?",
+                           (entry["amount"], plate_number))
+    conn.commit()
+    conn.close()
+
+def prune_deductions():
+    # Only safe once every journaled transaction has been applied (journal checkpoint)
+    conn = sqlite3.connect(FASTAG_DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM fastag_deductions")
+    conn.commit()
+    conn.close()
+
+# Run this when script loads
+init_fastag_store()
@@ -0,0 +1,229 @@
+import os
+import json
+import zlib
+import uuid
+import queue
+import struct
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from db import log_journal_entries, get_applied_txns, clear_applied_txns
+from fastag_api import deduct_fastag_amount, apply_deductions, load_fastag_accounts, prune_deductions
+
+# Append-only transaction journal. The lane decides a toll in memory (FASTag
+# balance check and deduction) and writes the decision here, fsynced, before
+# anything is shown or the boom opens. A background thread then applies batches
+# of decisions to fastag.db and logs.db, and whatever was left unapplied is
+# replayed on startup. Replay is idempotent: logs.db remembers applied txn ids
+# (journal_applied) and fastag.db remembers charged ones (fastag_deductions).
+#
+# Record layout: magic, payload length, crc32 of payload, then a JSON payload.
+JOURNAL_PATH = "journal.bin"
+RECORD_MAGIC = b"ATJ1"
+RECORD_HEADER = struct.Struct("<4sII")
+REPLAY_BATCH = 256
+CHECKPOINT_BYTES = 1024 * 1024
+RETRY_DELAY = 1.0
+
+
+def encode_record(record):
+    payload = json.dumps(record, separators=(",", ":")).encode()
+    return RECORD_HEADER.pack(RECORD_MAGIC, len(payload), zlib.crc32(payload)) + payload
+
+
+def read_records(path):
+    """Return (records, valid_end): every intact record, and the byte offset
+    where the first torn or corrupt one starts (the file size if none is)."""
+    if not os.path.exists(path):
+        return [], 0
+    with open(path, "rb") as f:
+        data = f.read()
+    records = []
+    offset = 0
+    while offset < len(data):
+        if offset + RECORD_HEADER.size > len(data):
+            break
+        magic, length, crc = RECORD_HEADER.unpack_from(data, offset)
+        start = offset + RECORD_HEADER.size
+        payload = data[start:start + length]
+        if magic != RECORD_MAGIC or len(payload) != length or zlib.crc32(payload) != crc:
+            break
+        records.append(json.loads(payload))
+        offset = start + length
+    if offset < len(data):
+        print(f"⚠️ Journal truncated at byte {offset}, ignoring the rest.")
+    return records, offset
+
+
+class TransactionJournal:
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self._file = None
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._pending = []
+        self._queued_seq = 0
+        self._durable_seq = 0
+        self._in_flight = 0
+        self._running = False
+        self._replay_queue = queue.Queue()
+        self._threads = []
+
+    def start(self):
+        self.recover()
+        self._file = open(self.path, "ab")
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._flush_loop, daemon=True),
+            threading.Thread(target=self._replay_loop, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._replay_queue.put(None)
+        self._threads[1].join()
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._threads[0].join()
+        self._checkpoint(force=True)
+        self._file.close()
+
+    def record_toll(self, plate, amount, vehicle_type, fastag_status, operator, lane_id, deduct=True):
+        """Charge the FASTag if asked, journal the outcome, and queue it for replay.
+
+        Returns False when the deduction was refused; nothing is logged then.
+        """
+        entry = {
+            "type": "intent",
+            "txn": uuid.uuid4().hex,
+            "plate": plate,
+            "amount": amount,
+            "vehicle_type": vehicle_type,
+            "fastag_status": fastag_status,
+            "operator": operator,
+            "lane_id": lane_id,
+            "deduct": deduct,
+            # Same format and clock (UTC) as CURRENT_TIMESTAMP
+            "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        entry["ok"] = deduct_fastag_amount(plate, amount) if deduct else True
+        if not entry["ok"]:
+            # Nothing to replay, so it need not be durable before we answer
+            self._append(entry)
+            return False
+
+        with self._cond:
+            self._in_flight += 1
+        self._append(entry, wait=True)
+        self._replay_queue.put(entry)
+        return True
+
+    def recover(self):
+        """Apply every journaled decision that never reached fastag.db/logs.db."""
+        records, valid_end = read_records(self.path)
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return 0
+        # Cut off a torn tail first: new records must never land behind garbage
+        self._truncate_file(valid_end)
+        # Only decisions the lane actually made; a refused charge is never retried
+        applied = get_applied_txns()
+        replay = [
+            record for record in records
+            if record["type"] == "intent" and record.get("ok") and record["txn"] not in applied
+        ]
+
+        apply_deductions(replay)
+        log_journal_entries(replay)
+        load_fastag_accounts()
+        self._truncate()
+        print(f"🔁 Journal recovery replayed {len(replay)} transaction(s).")
+        return len(replay)
+
+    def _append(self, record, wait=False):
+        data = encode_record(record)
+        with self._cond:
+            self._pending.append(data)
+            self._queued_seq += 1
+            seq = self._queued_seq
+            self._cond.notify_all()
+            if wait:
+                while self._durable_seq < seq:
+                    self._cond.wait()
+
+    def _flush_loop(self):
+        # Group commit: whatever piled up during the previous fsync goes in the next one
+        while True:
+            with self._cond:
+                while not self._pending and self._running:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+            with self._io_lock:
+                with self._cond:
+                    batch, self._pending = self._pending, []
+                    seq = self._queued_seq
+                self._file.write(b"".join(batch))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            with self._cond:
+                self._durable_seq = seq
+                self._cond.notify_all()
+
+    def _replay_loop(self):
+        stopping = False
+        while not stopping:
+            entry = self._replay_queue.get()
+            if entry is None:
+                break
+            batch = [entry]
+            while len(batch) < REPLAY_BATCH:
+                try:
+                    entry = self._replay_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            while True:
+                try:
+                    apply_deductions(batch)
+                    log_journal_entries(batch)
+                    break
+                except sqlite3.Error as e:
+                    print("Journal replay error:", e)
+                    time.sleep(RETRY_DELAY)
+
+            with self._cond:
+                self._in_flight -= len(batch)
+            self._checkpoint()
+
+    def _checkpoint(self, force=False):
+        # Once everything journaled is in logs.db the journal can start over
+        with self._io_lock:
+            with self._cond:
+                if self._in_flight or self._pending:
+                    return
+            if not force and os.fstat(self._file.fileno()).st_size < CHECKPOINT_BYTES:
+                return
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+            # Ledgers only gain rows from the replay thread (this one, or stopped)
+            # and nothing is in flight, so none of their txns can be replayed again
+            clear_applied_txns()
+            prune_deductions()
+
+    def _truncate_file(self, size):
+        with open(self.path, "r+b") as f:
+            f.truncate(size)
+            os.fsync(f.fileno())
+
+    def _truncate(self):
+        if os.path.exists(self.path):
+            self._truncate_file(0)
+        clear_applied_txns()
+        prune_deductions()
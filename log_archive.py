@@ -0,0 +1,194 @@
+import os
+import gzip
+import shutil
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from db import DB_PATH
+
+# vehicle_logs rows older than the hot window are moved into one SQLite file
+# per month (archive/logs_YYYY_MM.db), so logs.db stays small for the lane.
+ARCHIVE_FOLDER = "archive"
+HOT_MONTHS = 1  # current month only
+COMPRESS_AFTER_MONTHS = 3
+
+_rotate_lock = threading.Lock()
+
+
+def month_key(value):
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m")
+    return str(value)[:7]
+
+
+def shift_month(key, months):
+    year, month = map(int, key.split("-"))
+    index = year * 12 + (month - 1) + months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def partition_path(month):
+    return os.path.join(ARCHIVE_FOLDER, f"logs_{month.replace('-', '_')}.db")
+
+
+def list_partitions():
+    months = set()
+    if os.path.isdir(ARCHIVE_FOLDER):
+        for name in os.listdir(ARCHIVE_FOLDER):
+            if name.startswith("logs_") and (name.endswith(".db") or name.endswith(".db.gz")):
+                months.add(name[5:12].replace("_", "-"))
+    return sorted(months)
+
+
+def _decompress(src, dst):
+    tmp = dst + ".tmp"
+    with gzip.open(src, "rb") as fin, open(tmp, "wb") as fout:
+        shutil.copyfileobj(fin, fout)
+    os.replace(tmp, dst)
+
+
+def _writable_partition(month):
+    # Late rows for an already compressed month: unpack it so we can append
+    path = partition_path(month)
+    if not os.path.exists(path) and os.path.exists(path + ".gz"):
+        _decompress(path + ".gz", path)
+        os.remove(path + ".gz")
+    return path
+
+
+def archive_old_logs(hot_months=HOT_MONTHS):
+    """Move vehicle_logs rows older than the hot window into monthly archives."""
+    os.makedirs(ARCHIVE_FOLDER, exist_ok=True)
+    # CURRENT_TIMESTAMP is UTC, so the month boundary is too
+    cutoff = shift_month(month_key(datetime.utcnow()), -(hot_months - 1))
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT DISTINCT substr(timestamp, 1, 7) FROM vehicle_logs WHERE substr(timestamp, 1, 7) < ?",
+            (cutoff,),
+        )
+        months = [row[0] for row in cursor.fetchall()]
+
+        moved = 0
+        for month in months:
+            cursor.execute("ATTACH DATABASE ? AS part", (_writable_partition(month),))
+            try:
+                with conn:
+                    cursor.execute(
+                        "CREATE TABLE IF NOT EXISTS part.vehicle_logs AS SELECT * FROM main.vehicle_logs WHERE 0"
+                    )
+                    cursor.execute(
+                        "CREATE UNIQUE INDEX IF NOT EXISTS part.idx_vehicle_logs_id ON vehicle_logs (id)"
+                    )
+                    cursor.execute(
+                        "CREATE INDEX IF NOT EXISTS part.idx_vehicle_logs_plate ON vehicle_logs (plate)"
+                    )
+                    # Both databases commit together, so a crash cannot lose or duplicate rows
+                    cursor.execute(
+                        "INSERT OR IGNORE INTO part.vehicle_logs SELECT * FROM main.vehicle_logs WHERE substr(timestamp, 1, 7) = ?",
+                        (month,),
+                    )
+                    cursor.execute(
+                        "DELETE FROM main.vehicle_logs WHERE substr(timestamp, 1, 7) = ?",
+                        (month,),
+                    )
+                    moved += cursor.rowcount
+            finally:
+                cursor.execute("DETACH DATABASE part")
+
+        if moved:
+            cursor.execute("VACUUM")
+            print(f"📦 Archived {moved} log rows into {len(months)} monthly partition(s).")
+    finally:
+        conn.close()
+    return moved
+
+
+def compress_old_archives(after_months=COMPRESS_AFTER_MONTHS):
+    """Gzip monthly partitions that are old enough to no longer receive rows."""
+    cutoff = shift_month(month_key(datetime.utcnow()), -after_months)
+    compressed = 0
+    for month in list_partitions():
+        path = partition_path(month)
+        if month >= cutoff or not os.path.exists(path):
+            continue
+        tmp = path + ".gz.tmp"
+        with open(path, "rb") as fin, gzip.open(tmp, "wb") as fout:
+            shutil.copyfileobj(fin, fout)
+        os.replace(tmp, path + ".gz")
+        os.remove(path)
+        compressed += 1
+    return compressed
+
+
+def rotate_logs():
+    # Never raises: a locked database or full disk just retries on the next run
+    if not _rotate_lock.acquire(blocking=False):
+        return  # previous rotation still running
+    try:
+        archive_old_logs()
+        compress_old_archives()
+    except (sqlite3.Error, OSError) as e:
+        print("Log rotation failed:", e)
+    finally:
+        _rotate_lock.release()
+
+
+def rotate_logs_async():
+    threading.Thread(target=rotate_logs, daemon=True).start()
+
+
+def query_logs(start=None, end=None, plate=None):
+    """Search vehicle_logs across logs.db and every archive overlapping the range.
+
+    start and end are datetimes or "YYYY-MM-DD[ HH:MM:SS]" strings (inclusive).
+    Rows are returned newest first, in the same shape as vehicle_logs.
+    """
+    if isinstance(start, datetime):
+        start = start.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(end, datetime):
+        end = end.strftime("%Y-%m-%d %H:%M:%S")
+
+    clauses, params = [], []
+    if start:
+        clauses.append("timestamp >= ?")
+        params.append(start)
+    if end:
+        # Bare dates cover the whole day
+        clauses.append("timestamp <= ?")
+        params.append(end if len(end) > 10 else end + " 23:59:59")
+    if plate:
+        clauses.append("plate = ?")
+        params.append(plate.upper())
+    where = " WHERE " + " AND ".join(clauses) if clauses else ""
+
+    months = [
+        m for m in list_partitions()
+        if (not start or m >= month_key(start)) and (not end or m <= month_key(end))
+    ]
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT * FROM main.vehicle_logs{where}", params)
+    rows = cursor.fetchall()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        for month in months:
+            path = partition_path(month)
+            if not os.path.exists(path):
+                unpacked = os.path.join(scratch, os.path.basename(path))
+                _decompress(path + ".gz", unpacked)
+                path = unpacked
+            cursor.execute("ATTACH DATABASE ? AS part", (path,))
+            try:
+                cursor.execute(f"SELECT * FROM part.vehicle_logs{where}", params)
+                rows.extend(cursor.fetchall())
+            finally:
+                cursor.execute("DETACH DATABASE part")
+        conn.close()
+
+    rows.sort(key=lambda row: row[6] or "", reverse=True)
+    return rows
@@ -26,8 +26,12 @@ from PyQt5.QtCore import QTimer, Qt, QSize
 from PyQt5.QtGui import QImage, QPixmap, QIcon, QKeyEvent
 from ultralytics import YOLO
 import easyocr
-from db import authenticate_user, get_user_lane, log_entry
-from fastag_api import check_fastag, deduct_fastag_amount
+from db import authenticate_user, get_user_lane
+from fastag_api import check_fastag
+from journal import TransactionJournal
+from watchlist import Watchlist
+from capture import open_capture, frame_age
+from log_archive import rotate_logs_async
 import serial.tools.list_ports
 
 BEEP_PATH = os.path.join(os.path.dirname(__file__), "beep.wav")
@@ -35,6 +39,10 @@ CAPTURE_FOLDER = "captured"
 os.makedirs(CAPTURE_FOLDER, exist_ok=True)
 model = YOLO("best2.pt")
 
+# Camera index, video file, image folder/glob or stream URL
+CAMERA_SOURCE = 0
+CAMERA_OPTIONS = {"width": 1280, "height": 720, "fps": 30, "mjpeg": True}
+
 PRICING = {"Car": 60, "Bus": 120, "Truck": 150, "Auto": 40, "Bike": 30, "Tractor": 80}
 
 
@@ -108,7 +116,8 @@ class TollApp(QWidget):
         self.setup_boom_control()
 
         self.reader = easyocr.Reader(["en"], gpu=True)
-        self.cap = cv2.VideoCapture(0)
+        self.cap = open_capture(CAMERA_SOURCE, **CAMERA_OPTIONS)
+        self.camera_down = False
 
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_frame)
@@ -117,6 +126,23 @@ class TollApp(QWidget):
         self.last_detected_plate = ""
         self.current_frame = None
 
+        # Replays anything a previous crash left unapplied
+        self.journal = TransactionJournal()
+        self.journal.start()
+
+        # Keep logs.db to the current month; older rows go to archive/
+        # (runs off the GUI thread: VACUUM and gzip can take a while)
+        rotate_logs_async()
+        self.archive_timer = QTimer()
+        self.archive_timer.timeout.connect(rotate_logs_async)
+        self.archive_timer.start(60 * 60 * 1000)
+
+        # Stolen/blacklisted plates; rebuilt off-thread when watchlist.csv changes
+        self.watchlist = Watchlist()
+        self.watchlist_timer = QTimer()
+        self.watchlist_timer.timeout.connect(self.watchlist.refresh)
+        self.watchlist_timer.start(60 * 1000)
+
         rfid_port = find_rfid_port()
         if rfid_port:
             self.start_rfid_listener(rfid_port)
@@ -235,9 +261,17 @@ class TollApp(QWidget):
         self.setLayout(main)
 
     def update_frame(self):
-        ret, frame = self.cap.read()
-        if not ret:
+        frame, captured_at = self.cap.read()
+        if frame is None:
+            if not self.cap.connected and not self.camera_down:
+                self.camera_down = True
+                self.anpr_status.setText("ANPR: Camera reconnecting...")
+                self.anpr_status.setStyleSheet("color: orange; font-weight: bold;")
             return
+        if self.camera_down:
+            self.camera_down = False
+            self.anpr_status.setText("ANPR: Detecting...")
+            self.anpr_status.setStyleSheet("color: green; font-weight: bold;")
         self.current_frame = frame.copy()
         self.frame_count += 1
         if self.frame_count % 10 == 0:
@@ -245,7 +279,10 @@ class TollApp(QWidget):
             if plate and plate != self.last_detected_plate:
                 self.last_detected_plate = plate
                 self.plate_input.setText(plate)
+                self.check_watchlist(plate)
                 self.handle_auto_deduction(plate)
+                latency = frame_age(captured_at) * 1000
+                print(f"[INFO] {plate}: capture-to-decision {latency:.0f} ms")
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         image = QImage(rgb, rgb.shape[1], rgb.shape[0], QImage.Format_RGB888)
         self.video_label.setPixmap(QPixmap.fromImage(image))
@@ -268,15 +305,17 @@ class TollApp(QWidget):
         if tag_info["status"] == "Valid":
             amount = PRICING.get(tag_info.get("vehicle_class", "Car"), 60)
             if tag_info["balance"] >= amount:
-                deduct_fastag_amount(plate, amount)
-                self.capture_image(plate)
-                log_entry(
+                if not self.journal.record_toll(
                     plate,
+                    amount,
                     tag_info.get("vehicle_class", "Car"),
                     tag_info["status"],
                     self.user["username"],
                     self.lane,
-                )
+                ):
+                    self.show_deduction_refused(plate, amount)
+                    return
+                self.capture_image(plate)
                 self.update_transactions(
                     plate, tag_info.get("vehicle_class", "Car"), tag_info["status"]
                 )
@@ -285,6 +324,14 @@ class TollApp(QWidget):
             f"<b>Plate:</b> {plate} | <b>Status:</b> {tag_info['status']} | <b>Balance:</b> ₹{tag_info.get('balance', 0)}"
         )
 
+    def show_deduction_refused(self, plate, amount):
+        # Another read (RFID vs ANPR) can charge the tag between check and deduct
+        tag_info = check_fastag(plate)
+        print(f"❌ Deduction of ₹{amount} refused for {plate}")
+        self.info_table.setText(
+            f"<b>Plate:</b> {plate} | <b style='color:red'>Deduction failed</b> | <b>Balance:</b> ₹{tag_info.get('balance', 0)}"
+        )
+
     def toggle_boom(self, open_boom=True):
         if open_boom:
             self.boom_status.setText("🟢 Boom: Open")
@@ -308,8 +355,21 @@ class TollApp(QWidget):
         # Auto-close after 3 seconds
         QTimer.singleShot(3000, lambda: self.toggle_boom(False))
 
+    def check_watchlist(self, plate):
+        hits = self.watchlist.match(plate)
+        if not hits:
+            self.anpr_status.setText("ANPR: Detecting...")
+            self.anpr_status.setStyleSheet("color: green; font-weight: bold;")
+            return
+        listed, reason = hits[0]
+        note = "" if listed == plate else f" (read as {plate})"
+        print(f"🚨 Watchlist hit: {listed}{note} - {reason}")
+        self.anpr_status.setText(f"🚨 WATCHLIST: {listed}{note} - {reason}")
+        self.anpr_status.setStyleSheet("color: white; background-color: red; font-weight: bold;")
+
     def handle_rfid_tag(self, tag):
         self.plate_input.setText(tag.upper())
+        self.check_watchlist(tag)
         tag_info = check_fastag(tag)
 
         winsound.PlaySound(BEEP_PATH, winsound.SND_FILENAME | winsound.SND_ASYNC)
@@ -319,15 +379,17 @@ class TollApp(QWidget):
         if tag_info["status"] == "Valid":
             amount = PRICING.get(tag_info.get("vehicle_class", "Car"), 60)
             if tag_info["balance"] >= amount:
-                deduct_fastag_amount(tag, amount)
-                self.capture_image(tag)
-                log_entry(
+                if not self.journal.record_toll(
                     tag,
+                    amount,
                     tag_info.get("vehicle_class", "Car"),
                     tag_info["status"],
                     self.user["username"],
                     self.lane,
-                )
+                ):
+                    self.show_deduction_refused(tag, amount)
+                    return
+                self.capture_image(tag)
                 self.update_transactions(
                     tag, tag_info.get("vehicle_class", "Car"), tag_info["status"]
                 )
@@ -366,11 +428,17 @@ class TollApp(QWidget):
 
         if tag_info["status"] == "Valid":
             if tag_info["balance"] >= amount:
-                deduct_fastag_amount(plate, amount)
+                if not self.journal.record_toll(
+                    plate, amount, vehicle, tag_info["status"], self.user["username"], self.lane
+                ):
+                    # e.g. an RFID and an ANPR read charged the same tag first
+                    QMessageBox.warning(
+                        self,
+                        "Deduction Failed",
+                        f"₹{amount} could not be deducted from {tag_info['tag_id']}.\nBalance: ₹{tag_info['balance']:.2f}",
+                    )
+                    return
                 self.capture_image(plate)
-                log_entry(
-                    plate, vehicle, tag_info["status"], self.user["username"], self.lane
-                )
                 self.update_transactions(plate, vehicle, tag_info["status"])
 
                 # ✅ Show success message
@@ -398,8 +466,10 @@ class TollApp(QWidget):
 
         else:
             # Manual override transaction
+            self.journal.record_toll(
+                plate, amount, vehicle, "Manual", self.user["username"], self.lane, deduct=False
+            )
             self.capture_image(plate)
-            log_entry(plate, vehicle, "Manual", self.user["username"], self.lane)
             self.update_transactions(plate, vehicle, "Manual")
             QMessageBox.information(
                 self, "Manual Transaction", f"Manual transaction logged for {plate}."
@@ -456,7 +526,11 @@ class TollApp(QWidget):
             self.transactions_table.removeRow(5)
 
     def export_logs(self):
-        QMessageBox.information(self, "Info", "All logs are stored in logs.db")
+        QMessageBox.information(
+            self,
+            "Info",
+            "Recent logs are stored in logs.db, older months in the archive folder",
+        )
 
     def keyPressEvent(self, event: QKeyEvent):
         keys = {
@@ -472,6 +546,7 @@ class TollApp(QWidget):
 
     def closeEvent(self, event):
         self.cap.release()
+        self.journal.stop()
 
 
 class LoginScreen(QWidget):
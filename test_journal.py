@@ -0,0 +1,116 @@
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# db.py and fastag_api.py create their databases in the working directory on import
+os.chdir(tempfile.mkdtemp())
+
+import journal
+import fastag_api
+
+
+def stored_balance(plate):
+    conn = sqlite3.connect(fastag_api.FASTAG_DB_PATH)
+    row = conn.execute("SELECT balance FROM fastag_accounts WHERE plate=?", (plate,)).fetchone()
+    conn.close()
+    return row[0]
+
+
+def toll_record(txn, plate, **fields):
+    record = {
+        "type": "intent", "txn": txn, "plate": plate, "amount": 10,
+        "vehicle_type": "Car", "fastag_status": "Valid", "operator": "admin",
+        "lane_id": "1", "deduct": True, "ok": True, "timestamp": "2026-10-19 10:00:00",
+    }
+    record.update(fields)
+    return record
+
+
+def logged_plates():
+    conn = sqlite3.connect("logs.db")
+    rows = conn.execute("SELECT plate FROM vehicle_logs").fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+
+class JournalRecoveryTest(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mktemp(suffix=".bin", dir=".")
+
+    def test_torn_first_record_is_discarded_before_appending(self):
+        # A crash during the first write after a checkpoint leaves a torn header
+        with open(self.path, "wb") as f:
+            f.write(journal.encode_record({"type": "intent"})[:7])
+
+        j = journal.TransactionJournal(self.path)
+        j.start()
+        self.assertTrue(j.record_toll("UP32GH5678", 10, "Truck", "Valid", "admin", "1"))
+
+        # Everything written after startup must be visible to recovery
+        records, valid_end = journal.read_records(self.path)
+        self.assertEqual(valid_end, os.path.getsize(self.path))
+        self.assertEqual([r["plate"] for r in records if r["type"] == "intent"], ["UP32GH5678"])
+        j.stop()
+
+    def test_recover_replays_intact_records_and_drops_torn_tail(self):
+        entry = {
+            "type": "intent", "txn": "t-recover", "plate": "TN09AB1234", "amount": 40,
+            "vehicle_type": "Auto", "fastag_status": "Manual", "operator": "admin",
+            "lane_id": "1", "deduct": False, "ok": True, "timestamp": "2026-10-19 10:00:00",
+        }
+        with open(self.path, "wb") as f:
+            f.write(journal.encode_record(entry))
+            f.write(journal.encode_record(dict(entry, txn="t-torn"))[:-3])
+
+        self.assertEqual(journal.TransactionJournal(self.path).recover(), 1)
+        self.assertEqual(logged_plates().count("TN09AB1234"), 1)
+        self.assertEqual(os.path.getsize(self.path), 0)
+
+    def test_recover_skips_records_already_applied(self):
+        entry = {
+            "type": "intent", "txn": "t-applied", "plate": "KL07CD4321", "amount": 40,
+            "vehicle_type": "Auto", "fastag_status": "Manual", "operator": "admin",
+            "lane_id": "1", "deduct": False, "ok": True, "timestamp": "2026-10-19 10:00:00",
+        }
+        # Replay thread wrote the row, then the process died before the checkpoint
+        journal.log_journal_entries([entry])
+        with open(self.path, "wb") as f:
+            f.write(journal.encode_record(entry))
+
+        self.assertEqual(journal.TransactionJournal(self.path).recover(), 0)
+        self.assertEqual(logged_plates().count("KL07CD4321"), 1)
+
+
+    def test_recover_applies_charged_tolls_once(self):
+        before = stored_balance("MH14BK6899")
+        with open(self.path, "wb") as f:
+            f.write(journal.encode_record(toll_record("t-charged", "MH14BK6899")))
+
+        self.assertEqual(journal.TransactionJournal(self.path).recover(), 1)
+        self.assertEqual(stored_balance("MH14BK6899"), before - 10)
+        self.assertEqual(fastag_api.FASTAG_DATABASE["MH14BK6899"]["balance"], before - 10)
+
+        # Balance already applied but the log row not: the ledger skips the charge
+        fastag_api.apply_deductions([toll_record("t-half", "MH14BK6899")])
+        with open(self.path, "wb") as f:
+            f.write(journal.encode_record(toll_record("t-half", "MH14BK6899")))
+        journal.TransactionJournal(self.path).recover()
+        self.assertEqual(stored_balance("MH14BK6899"), before - 20)
+
+    def test_recover_never_charges_undecided_or_refused_tolls(self):
+        before = stored_balance("MH14BK6899")
+        undecided = toll_record("t-undecided", "MH14BK6899")
+        del undecided["ok"]
+        with open(self.path, "wb") as f:
+            f.write(journal.encode_record(undecided))
+            f.write(journal.encode_record(toll_record("t-refused", "MH14BK6899", ok=False)))
+
+        self.assertEqual(journal.TransactionJournal(self.path).recover(), 0)
+        self.assertEqual(stored_balance("MH14BK6899"), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,8 @@
-import sqlite3
+from log_archive import query_logs
 
-conn = sqlite3.connect("logs.db")  # Ensure path is correct
-cursor = conn.cursor()
-
-cursor.execute("SELECT * FROM vehicle_logs ORDER BY timestamp DESC")
-rows = cursor.fetchall()
+# Searches logs.db and every monthly archive
+rows = query_logs()
 
 print("Stored Logs:")
 for row in rows:
     print(row)
-
-conn.close()
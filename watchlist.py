@@ -0,0 +1,266 @@
+import os
+import re
+import glob
+import sys
+import json
+import mmap
+import struct
+import threading
+import subprocess
+from array import array
+from bisect import bisect_left
+
+# Stolen / blacklisted plate lists. The CSV source ("plate,reason" per line)
+# is compiled into a read-only index file that is mmap'd by the lane:
+#
+#   header | sorted uint64 plate keys | uint32 reason codes | reason offsets
+#   | reason text | Bloom filter bits
+#
+# A key is the plate in base 37 (one digit per character) and its reason code
+# sits at the same position in the codes array, so a lookup is one Bloom probe
+# plus a bisect on the keys. Reasons (often per-entry FIR/case numbers) are only
+# decoded on a hit.
+WATCHLIST_PATH = "watchlist.csv"
+INDEX_MAGIC = b"ATW2"
+INDEX_HEADER = struct.Struct("<4sQQII")
+BLOOM_BITS_PER_ENTRY = 10
+BLOOM_HASHES = 4
+
+PLATE_PATTERN = re.compile(r"^[A-Z]{2}[0-9]{1,2}[A-Z]{1,2}[0-9]{4}$")
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+CHAR_CODES = {c: i + 1 for i, c in enumerate(ALPHABET)}
+
+# Characters OCR commonly reads as one another
+OCR_CONFUSIONS = {
+    "0": "ODQ", "O": "0DQ", "D": "0O", "Q": "0O",
+    "1": "IL", "I": "1L", "L": "1I",
+    "2": "Z", "Z": "2", "5": "S", "S": "5",
+    "6": "G", "G": "6", "8": "B", "B": "8",
+    "4": "A", "A": "4", "7": "T", "T": "7",
+    "U": "V", "V": "U", "M": "N", "N": "M",
+}
+
+_MASK = (1 << 64) - 1
+
+
+def encode_plate(plate):
+    key = 0
+    for c in plate:
+        key = key * 37 + CHAR_CODES[c]
+    return key
+
+
+def bloom_positions(key, bits):
+    # splitmix64, then double hashing for the k positions
+    h = (key + 0x9E3779B97F4A7C15) & _MASK
+    h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & _MASK
+    h ^= h >> 31
+    h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+    return [(h1 + i * h2) % bits for i in range(BLOOM_HASHES)]
+
+
+def ocr_variants(plate):
+    """Plates one OCR confusion away from `plate` that are still valid plates."""
+    variants = []
+    for i, c in enumerate(plate):
+        for alt in OCR_CONFUSIONS.get(c, ""):
+            candidate = plate[:i] + alt + plate[i + 1:]
+            if PLATE_PATTERN.match(candidate):
+                variants.append(candidate)
+    return variants
+
+
+def write_index(path, entries, labels):
+    """Write an index from (plate, reason code) pairs; labels[code] is the reason."""
+    keys, codes = array("Q"), array("I")
+    for packed in sorted({encode_plate(p) << 32 | code for p, code in entries}):
+        key = packed >> 32
+        if keys and keys[-1] == key:
+            continue  # plate listed twice: keep one reason
+        keys.append(key)
+        codes.append(packed & 0xFFFFFFFF)
+
+    bloom_bits = max(64, len(keys) * BLOOM_BITS_PER_ENTRY + 7) // 8 * 8
+    bloom = bytearray(bloom_bits // 8)
+    for key in keys:
+        for pos in bloom_positions(key, bloom_bits):
+            bloom[pos >> 3] |= 1 << (pos & 7)
+
+    label_text = [label.encode() for label in labels]
+    offsets = array("I", [0])
+    for text in label_text:
+        offsets.append(offsets[-1] + len(text))
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, len(keys), bloom_bits, len(labels), offsets[-1]))
+        f.write(b"\0" * (-INDEX_HEADER.size % 8))
+        f.write(keys.tobytes())
+        f.write(codes.tobytes())
+        f.write(offsets.tobytes())
+        f.write(b"".join(label_text))
+        f.write(bloom)
+    os.replace(tmp, path)
+    return len(keys)
+
+
+def build_index(source, path):
+    labels, codes, entries = [], {}, []
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            plate, _, reason = line.strip().partition(",")
+            plate = plate.replace(" ", "").upper()
+            if not PLATE_PATTERN.match(plate):
+                continue  # header or junk line
+            reason = reason.strip() or "Watchlist"
+            if reason not in codes:
+                codes[reason] = len(labels)
+                labels.append(reason)
+            entries.append((plate, codes[reason]))
+    return write_index(path, entries, labels)
+
+
+def index_path_for(source):
+    # Versioned by the source's mtime: a mapped file is never replaced in place
+    return f"{source}.{os.stat(source).st_mtime_ns}.idx"
+
+
+def existing_indexes(source):
+    """Index files built from earlier versions of `source`, oldest first."""
+    versions = []
+    for path in glob.glob(glob.escape(source) + ".*.idx"):
+        version = path[len(source) + 1:-len(".idx")]
+        if version.isdigit():
+            versions.append((int(version), path))
+    return [path for _, path in sorted(versions)]
+
+
+class WatchlistIndex:
+    def __init__(self, path=None):
+        self.path = path
+        if path is None:
+            self.keys, self.codes, self.bloom, self.bloom_bits = array("Q"), array("I"), b"\0" * 8, 64
+            self.label_offsets, self.label_text = array("I", [0]), b""
+            return
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        magic, count, self.bloom_bits, label_count, text_len = INDEX_HEADER.unpack_from(view)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path} is not a watchlist index (or an older format)")
+        offset = INDEX_HEADER.size + (-INDEX_HEADER.size % 8)
+        self.keys = view[offset:offset + count * 8].cast("Q")
+        offset += count * 8
+        self.codes = view[offset:offset + count * 4].cast("I")
+        offset += count * 4
+        self.label_offsets = view[offset:offset + (label_count + 1) * 4].cast("I")
+        offset += (label_count + 1) * 4
+        self.label_text = view[offset:offset + text_len]
+        offset += text_len
+        self.bloom = view[offset:offset + self.bloom_bits // 8]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def label(self, code):
+        return bytes(self.label_text[self.label_offsets[code]:self.label_offsets[code + 1]]).decode()
+
+    def lookup(self, plate):
+        key = encode_plate(plate)
+        bloom = self.bloom
+        for pos in bloom_positions(key, self.bloom_bits):
+            if not bloom[pos >> 3] & (1 << (pos & 7)):
+                return None
+        keys = self.keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            return self.label(self.codes[i])
+        return None
+
+
+class Watchlist:
+    def __init__(self, source=WATCHLIST_PATH):
+        self.source = os.path.abspath(source)
+        self.index = WatchlistIndex()
+        self._loaded_path = None
+        self._reloading = False
+        # Serve the newest index we already have while a changed list rebuilds
+        for path in reversed(existing_indexes(self.source)):
+            try:
+                self._swap(path)
+                break
+            except (OSError, ValueError) as e:
+                print("Watchlist index unreadable:", e)
+        self.refresh()
+
+    def match(self, plate, fuzzy=True):
+        """Return [(plate, reason)] hits: the exact plate first, then OCR variants."""
+        plate = plate.replace(" ", "").upper()
+        if not plate.isalnum() or not plate.isascii():
+            return []
+        index = self.index  # the reload thread may swap it underneath us
+        hits = []
+        if PLATE_PATTERN.match(plate):
+            reason = index.lookup(plate)
+            if reason is not None:
+                hits.append((plate, reason))
+        if fuzzy:
+            for candidate in ocr_variants(plate):
+                reason = index.lookup(candidate)
+                if reason is not None:
+                    hits.append((candidate, reason))
+        return hits
+
+    def refresh(self):
+        """Pick up a changed source list in the background; the lane keeps matching."""
+        if self._reloading:
+            return
+        self._remove_stale()  # retries files that were still mapped last time
+        if not os.path.exists(self.source):
+            return
+        path = index_path_for(self.source)
+        if path == self._loaded_path:
+            return
+        self._reloading = True
+        threading.Thread(target=self._reload, args=(path,), daemon=True).start()
+
+    def _reload(self, path):
+        try:
+            if os.path.exists(path):
+                try:
+                    self._swap(path)
+                    return
+                except ValueError as e:
+                    print("Rebuilding watchlist index:", e)
+                    os.remove(path)
+            # Separate process, so building millions of keys never holds our GIL
+            subprocess.run(
+                [sys.executable, os.path.abspath(__file__), self.source, path],
+                check=True,
+            )
+            self._swap(path)
+        except (OSError, ValueError, subprocess.CalledProcessError) as e:
+            print("Watchlist reload failed:", e)
+        finally:
+            self._reloading = False
+
+    def _swap(self, path):
+        self.index = WatchlistIndex(path)
+        self._loaded_path = path
+        print(f"🚨 Watchlist loaded: {len(self.index)} plates.")
+        self._remove_stale()
+
+    def _remove_stale(self):
+        for path in existing_indexes(self.source):
+            if path == self._loaded_path:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # still mapped by a lookup in flight (Windows); next refresh retries
+
+
+if __name__ == "__main__":
+    count = build_index(sys.argv[1], sys.argv[2])
+    print(f"Built watchlist index with {count} plates.")